@@ -435,6 +435,8 @@ def _engine_uri(options, file_config):
         if not config._current:
             cfg.set_as_current(cfg, testing)
 
+    provision.wait_for_connectivity_checks()
+
 
 @post
 def _requirements(options, file_config):
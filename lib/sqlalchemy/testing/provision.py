@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 import collections
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import logging
 
 from . import config
@@ -10,6 +12,7 @@ from . import engines
 from . import util
 from .. import exc
 from .. import inspect
+from ..dialects import registry
 from ..engine import url as sa_url
 from ..sql import ddl
 from ..sql import schema
@@ -19,11 +22,106 @@ log = logging.getLogger(__name__)
 
 FOLLOWER_IDENT = None
 
+_provisioned_backends = set()
+
+_connectivity_executor = None
+_connectivity_futures = []
+
+
+def _defer_connectivity_check(eng):
+    """Schedule a connect()/close() validation of the given engine.
+
+    The checks run on a shared thread pool so that the connect round
+    trips for multiple configured databases overlap rather than running
+    serially; :func:`.wait_for_connectivity_checks` resolves them once
+    all configs are set up.
+
+    """
+    global _connectivity_executor
+    if _connectivity_executor is None:
+        _connectivity_executor = ThreadPoolExecutor(max_workers=4)
+    _connectivity_futures.append(
+        _connectivity_executor.submit(lambda: eng.connect().close())
+    )
+
+
+def wait_for_connectivity_checks():
+    """Resolve connectivity checks deferred by :func:`.setup_config`."""
+
+    global _connectivity_executor
+    try:
+        for future in _connectivity_futures:
+            future.result()
+    finally:
+        del _connectivity_futures[:]
+        if _connectivity_executor is not None:
+            _connectivity_executor.shutdown()
+            _connectivity_executor = None
+
+
+def _load_provisioning(dialect):
+    """Invoke ``dialect.load_provisioning()`` once per backend name."""
+
+    if dialect.name not in _provisioned_backends:
+        dialect.load_provisioning()
+        _provisioned_backends.add(dialect.name)
+
+
+_backend_names = {}
+_driver_names = {}
+
+
+def _backend(url):
+    """Memoized equivalent of ``url.get_backend_name()``.
+
+    The backend name is a pure function of the immutable URL's
+    drivername, so cache it rather than re-parsing the string on
+    every hook dispatch.
+
+    """
+    drivername = url.drivername
+    try:
+        return _backend_names[drivername]
+    except KeyError:
+        name = _backend_names[drivername] = url.get_backend_name()
+        return name
+
+
+def _driver(url):
+    """Memoized equivalent of ``url.get_driver_name()``.
+
+    For URLs with no explicit driver this loads the default dialect to
+    get its driver name; caching by drivername means that happens once
+    per backend.
+
+    """
+    drivername = url.drivername
+    try:
+        return _driver_names[drivername]
+    except KeyError:
+        name = _driver_names[drivername] = url.get_driver_name()
+        return name
+
+
+@lru_cache(maxsize=64)
+def _parsed(cfg_str):
+    """Parse a string URL and extract its backend name, memoized.
+
+    Provisioning hooks are routinely re-dispatched against the same
+    string URL; cache the parse and backend lookup per string.
+
+    """
+    url = sa_url.make_url(cfg_str)
+    return url, _backend(url)
+
 
 class register:
+    __slots__ = ("fns", "decorator", "_star")
+
     def __init__(self, decorator=None):
         self.fns = {}
         self.decorator = decorator
+        self._star = None
 
     @classmethod
     def init(cls, fn):
@@ -39,26 +137,32 @@ class register:
                 fn = self.decorator(fn)
             for dbname in dbnames:
                 self.fns[dbname] = fn
+                if dbname == "*":
+                    self._star = fn
             return self
 
         return decorate
 
     def __call__(self, cfg, *arg):
+        if len(self.fns) == 1 and self._star is not None:
+            # no dialect has specialized this hook; don't bother
+            # extracting the backend name from the URL
+            return self._star(cfg, *arg)
+
         if isinstance(cfg, str):
-            url = sa_url.make_url(cfg)
-        elif isinstance(cfg, sa_url.URL):
-            url = cfg
-        else:
-            url = cfg.db.url
-        backend = url.get_backend_name()
-        if backend in self.fns:
-            return self.fns[backend](cfg, *arg)
+            url, backend = _parsed(cfg)
         else:
-            return self.fns["*"](cfg, *arg)
+            if isinstance(cfg, sa_url.URL):
+                url = cfg
+            else:
+                url = cfg.db.url
+            backend = _backend(url)
+        fn = self.fns.get(backend, self._star)
+        return fn(cfg, *arg)
 
 
 def create_follower_db(follower_ident):
-    for cfg in _configs_for_db_operation():
+    for cfg in _configs_for_host():
         log.info("CREATE database %s, URI %r", follower_ident, cfg.db.url)
         create_db(cfg, cfg.db, follower_ident)
 
@@ -67,17 +171,18 @@ def setup_config(db_url, options, file_config, follower_ident):
     # load the dialect, which should also have it set up its provision
     # hooks
 
-    dialect = sa_url.make_url(db_url).get_dialect()
-    dialect.load_provisioning()
+    url_obj = sa_url.make_url(db_url)
+    dialect = url_obj.get_dialect()
+    _load_provisioning(dialect)
 
     if follower_ident:
-        db_url = follower_url_from_main(db_url, follower_ident)
+        url_obj = follower_url_from_main(url_obj, follower_ident)
     db_opts = {}
-    update_db_opts(db_url, db_opts, options)
+    update_db_opts(url_obj, db_opts, options)
     db_opts["scope"] = "global"
-    eng = engines.testing_engine(db_url, db_opts)
-    post_configure_engine(db_url, eng, follower_ident)
-    eng.connect().close()
+    eng = engines.testing_engine(url_obj, db_opts)
+    post_configure_engine(url_obj, eng, follower_ident)
+    _defer_connectivity_check(eng)
 
     cfg = config.Config.register(eng, db_opts, options, file_config)
 
@@ -92,11 +197,33 @@ def setup_config(db_url, options, file_config, follower_ident):
 
 
 def drop_follower_db(follower_ident):
-    for cfg in _configs_for_db_operation():
+    for cfg in _configs_for_host():
         log.info("DROP database %s, URI %r", follower_ident, cfg.db.url)
         drop_db(cfg, cfg.db, follower_ident)
 
 
+def _configs_for_host():
+    """Yield one config per distinct (backend, host, port).
+
+    A follower database is created / dropped once per server, so configs
+    that differ only in username or database would otherwise each pay a
+    full connect + DDL round trip for the same statement.  URLs with no
+    host component (e.g. sqlite files) are exempt from the collapse, as
+    their create/drop hooks act per-config, not per-host.
+
+    """
+    hosts = set()
+    for cfg in _configs_for_db_operation():
+        url = cfg.db.url
+        if url.host is None:
+            yield cfg
+            continue
+        host_key = (_backend(url), url.host, url.port)
+        if host_key not in hosts:
+            hosts.add(host_key)
+            yield cfg
+
+
 def generate_db_urls(db_urls, extra_drivers):
     """Generate a set of URLs to test given configured URLs plus additional
     driver names.
@@ -132,44 +259,74 @@ def generate_db_urls(db_urls, extra_drivers):
     """
     urls = set()
 
-    backend_to_driver_we_already_have = collections.defaultdict(set)
+    backend_to_driver_we_already_have = {}
+
+    dialects_by_drivername = {}
 
-    urls_plus_dialects = [
-        (url_obj, url_obj.get_dialect())
-        for url_obj in [sa_url.make_url(db_url) for db_url in db_urls]
-    ]
+    # dedupe the incoming URL strings while preserving order, so that
+    # repeated --dburi entries don't incur repeated parsing / dialect
+    # resolution
+    unique_db_urls = list(dict.fromkeys(db_urls))
+
+    urls_plus_dialects = []
+    for url_obj in [sa_url.make_url(db_url) for db_url in unique_db_urls]:
+        drivername = url_obj.drivername
+        if drivername not in dialects_by_drivername:
+            dialects_by_drivername[drivername] = url_obj.get_dialect()
+        urls_plus_dialects.append(
+            (url_obj, dialects_by_drivername[drivername])
+        )
 
     for url_obj, dialect in urls_plus_dialects:
-        backend_to_driver_we_already_have[dialect.name].add(dialect.driver)
+        backend_to_driver_we_already_have.setdefault(dialect.name, set()).add(
+            dialect.driver
+        )
 
     backend_to_driver_we_need = {}
+    extra_drivers_set = set(extra_drivers)
 
     for url_obj, dialect in urls_plus_dialects:
         backend = dialect.name
-        dialect.load_provisioning()
+        _load_provisioning(dialect)
 
         if backend not in backend_to_driver_we_need:
-            backend_to_driver_we_need[backend] = extra_per_backend = set(
-                extra_drivers
-            ).difference(backend_to_driver_we_already_have[backend])
+            backend_to_driver_we_need[backend] = extra_per_backend = (
+                extra_drivers_set
+                - backend_to_driver_we_already_have[backend]
+            )
         else:
             extra_per_backend = backend_to_driver_we_need[backend]
 
-        for driver_url in _generate_driver_urls(url_obj, extra_per_backend):
-            if driver_url in urls:
-                continue
+        driver_urls, consumed_drivers = _generate_driver_urls(
+            url_obj, extra_per_backend
+        )
+        extra_per_backend -= consumed_drivers
+
+        for driver_url in driver_urls:
+            # add + length check rather than a separate membership
+            # test; one hash of the URL string per candidate
+            prev_len = len(urls)
             urls.add(driver_url)
-            yield driver_url
+            if len(urls) != prev_len:
+                yield driver_url
 
 
 def _generate_driver_urls(url, extra_drivers):
-    main_driver = url.get_driver_name()
-    extra_drivers.discard(main_driver)
+    """Generate URLs for the given URL plus extra driver names.
+
+    Returns a tuple ``(driver_urls, consumed_drivers)``; the incoming
+    ``extra_drivers`` set is not mutated, the caller subtracts the
+    consumed drivers itself.
+
+    """
+    main_driver = _driver(url)
+
+    consumed = {main_driver} if main_driver in extra_drivers else set()
 
     url = generate_driver_url(url, main_driver, "")
-    yield str(url)
+    driver_urls = [str(url)]
 
-    for drv in list(extra_drivers):
+    for drv in extra_drivers - consumed:
 
         if "?" in drv:
 
@@ -181,45 +338,59 @@ def _generate_driver_urls(url, extra_drivers):
 
         new_url = generate_driver_url(url, driver_only, query_str)
         if new_url:
-            extra_drivers.remove(drv)
+            consumed.add(drv)
 
-            yield str(new_url)
+            driver_urls.append(str(new_url))
+
+    return driver_urls, consumed
 
 
 @register.init
 def generate_driver_url(url, driver, query_str):
-    backend = url.get_backend_name()
-
-    new_url = url.set(
-        drivername="%s+%s" % (backend, driver),
-    )
-    if query_str:
-        new_url = new_url.update_query_string(query_str)
+    backend = _backend(url)
 
+    # probe the dialect registry first, so that an unusable driver name
+    # doesn't cost a URL copy that's then thrown away
     try:
-        new_url.get_dialect()
+        registry.load(f"{backend}.{driver}")
     except exc.NoSuchModuleError:
         return None
-    else:
-        return new_url
+
+    new_url = url.set(drivername=f"{backend}+{driver}")
+    if query_str:
+        new_url = new_url.update_query_string(query_str)
+
+    return new_url
 
 
 def _configs_for_db_operation():
     hosts = set()
 
-    for cfg in config.Config.all_configs():
+    cfgs = list(config.Config.all_configs())
+
+    for cfg in cfgs:
         cfg.db.dispose()
 
-    for cfg in config.Config.all_configs():
+    yielded = []
+    hosts_add = hosts.add
+    yielded_append = yielded.append
+    for cfg in cfgs:
         url = cfg.db.url
-        backend = url.get_backend_name()
-        host_conf = (backend, url.username, url.host, url.database)
+        host_conf = (
+            _backend(url),
+            url.username,
+            url.host,
+            url.database,
+        )
 
         if host_conf not in hosts:
             yield cfg
-            hosts.add(host_conf)
+            hosts_add(host_conf)
+            yielded_append(cfg)
 
-    for cfg in config.Config.all_configs():
+    # only the yielded configs may have had new connections opened
+    # against them; the rest were already disposed in the pre-sweep
+    for cfg in yielded:
         cfg.db.dispose()
 
 
@@ -367,7 +538,8 @@ def follower_url_from_main(url, ident):
     :param ident: the pytest-xdist "worker identifier" to be used as the
                   database name
     """
-    url = sa_url.make_url(url)
+    if not isinstance(url, sa_url.URL):
+        url = sa_url.make_url(url)
     return url.set(database=ident)
 
 
@@ -392,24 +564,33 @@ def run_reap_dbs(url, ident):
 def reap_dbs(idents_file):
     log.info("Reaping databases...")
 
-    urls = collections.defaultdict(set)
+    urls = {}
     idents = collections.defaultdict(set)
     dialects = {}
 
+    # interned (backend, host) key tuples; followers on the same host
+    # then share one key object rather than hashing a fresh tuple per
+    # line
+    key_cache = {}
+
+    _make_url = sa_url.make_url
     with open(idents_file) as file_:
-        for line in file_:
-            line = line.strip()
-            db_name, db_url = line.split(" ")
-            url_obj = sa_url.make_url(db_url)
-            if db_name not in dialects:
-                dialects[db_name] = url_obj.get_dialect()
-                dialects[db_name].load_provisioning()
-            url_key = (url_obj.get_backend_name(), url_obj.host)
-            urls[url_key].add(db_url)
+        for line in file_.read().splitlines():
+            if not line:
+                continue
+            db_name, _, db_url = line.partition(" ")
+            url_obj = _make_url(db_url)
+            backend = _backend(url_obj)
+            if backend not in dialects:
+                dialects[backend] = url_obj.get_dialect()
+                _load_provisioning(dialects[backend])
+            raw_key = (backend, url_obj.host)
+            url_key = key_cache.setdefault(raw_key, raw_key)
+            # only one representative URL per key is needed downstream
+            urls.setdefault(url_key, db_url)
             idents[url_key].add(db_name)
 
-    for url_key in urls:
-        url = list(urls[url_key])[0]
+    for url_key, url in urls.items():
         ident = idents[url_key]
         run_reap_dbs(url, ident)
 